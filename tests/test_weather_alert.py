@@ -1,10 +1,12 @@
+import threading
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
 from weather_alert.alert_system import AlertSystem
-from weather_alert.weather_service import WeatherCondition, WeatherService
+from weather_alert.main import check_weather, parse_locations, run_scheduler
+from weather_alert.weather_service import Severity, WeatherCondition, WeatherService
 
 
 @pytest.fixture
@@ -22,6 +24,18 @@ def weather_service(mock_api_key, mock_location):
     return WeatherService(mock_api_key, mock_location)
 
 
+@pytest.fixture
+def forecast_response():
+    """Successful forecast API response with an empty forecast list"""
+    response = Mock()
+    response.status_code = 200
+    response.headers = {}
+    response.content = b'{"list": []}'
+    response.json.return_value = {"list": []}
+    response.raise_for_status.return_value = None
+    return response
+
+
 @pytest.fixture
 def alert_system():
     return AlertSystem(
@@ -33,14 +47,14 @@ def test_weather_condition_creation():
     """Test WeatherCondition dataclass creation"""
     condition = WeatherCondition(
         type="temperature",
-        severity="extreme",
+        severity=Severity.EXTREME,
         description="Extreme Heat",
         value=42.5,
         unit="°C",
     )
 
     assert condition.type == "temperature"
-    assert condition.severity == "extreme"
+    assert condition.severity == Severity.EXTREME
     assert condition.description == "Extreme Heat"
     assert condition.value == 42.5
     assert condition.unit == "°C"
@@ -82,6 +96,35 @@ def test_weather_condition_creation():
             },
             1,  # Expected number of conditions
         ),
+        # Test case with extreme cold
+        (
+            {"list": [{"main": {"temp": -20}, "wind": {"speed": 5}, "weather": []}]},
+            1,  # Expected number of conditions
+        ),
+        # Test case with heavy rain
+        (
+            {
+                "list": [
+                    {
+                        "main": {"temp": 20},
+                        "wind": {"speed": 5},
+                        "rain": {"3h": 60},
+                        "weather": [],
+                    }
+                ]
+            },
+            1,  # Expected number of conditions
+        ),
+        # Test case with mild weather across several entries
+        (
+            {
+                "list": [
+                    {"main": {"temp": 20}, "wind": {"speed": 5}, "weather": []},
+                    {"main": {"temp": 15}, "wind": {"speed": 10}, "rain": {"1h": 2}},
+                ]
+            },
+            0,  # Expected number of conditions
+        ),
     ],
 )
 def test_analyze_forecast(weather_service, forecast_data, expected_conditions):
@@ -91,14 +134,105 @@ def test_analyze_forecast(weather_service, forecast_data, expected_conditions):
     assert len(conditions) == expected_conditions
 
 
-@patch("requests.get")
-def test_fetch_forecast_success(mock_get, weather_service):
+def test_analyze_forecast_merges_repeated_conditions(weather_service):
+    """Test a condition repeated across entries is reported once at its peak"""
+    forecast_data = {
+        "list": [
+            {"main": {"temp": temp}, "wind": {"speed": 5}, "weather": []}
+            for temp in (41, 43.5, 42)
+        ]
+    }
+
+    conditions = weather_service.analyze_forecast(forecast_data)
+
+    assert len(conditions) == 1
+    assert conditions[0].description == "Extreme Heat"
+    assert conditions[0].value == 43.5
+
+
+def test_analyze_forecast_min_severity(mock_api_key, mock_location):
+    """Test conditions below the minimum severity are not emitted"""
+    weather_service = WeatherService(
+        mock_api_key, mock_location, min_severity="extreme"
+    )
+    forecast_data = {
+        "list": [
+            {
+                "main": {"temp": 41},
+                "wind": {"speed": 25},  # 90 km/h, severe
+                "weather": [],
+            }
+        ]
+    }
+
+    conditions = weather_service.analyze_forecast(forecast_data)
+
+    assert [condition.description for condition in conditions] == ["Extreme Heat"]
+
+
+def test_analyze_forecast_min_severity_uses_condition_rank(mock_api_key, mock_location):
+    """Test filtering follows each emitted condition's own severity"""
+    weather_service = WeatherService(
+        mock_api_key, mock_location, min_severity="warning"
+    )
+    forecast_data = {
+        "list": [
+            {
+                "main": {"temp": 20},
+                "wind": {"speed": 25},  # 90 km/h, severe
+                "rain": {"3h": 60},  # heavy rain, info
+                "weather": [],
+            }
+        ]
+    }
+
+    conditions = weather_service.analyze_forecast(forecast_data)
+
+    assert [condition.description for condition in conditions] == ["High Winds"]
+
+
+def test_analyze_forecast_follows_severe_condition_changes(weather_service):
+    """Test edits to the severe condition keywords apply to later analyses"""
+    forecast_data = {
+        "list": [
+            {
+                "main": {"temp": 20},
+                "wind": {"speed": 5},
+                "weather": [{"main": "Fog", "description": "dense fog"}],
+            }
+        ]
+    }
+
+    assert weather_service.analyze_forecast(forecast_data) == []
+
+    weather_service.thresholds["severe_conditions"].append("fog")
+    conditions = weather_service.analyze_forecast(forecast_data)
+
+    assert [condition.description for condition in conditions] == [
+        "Severe Weather: dense fog"
+    ]
+
+    weather_service.thresholds["severe_conditions"].clear()
+
+    assert weather_service.analyze_forecast(forecast_data) == []
+
+
+def test_analyze_forecast_wind_in_kmh(weather_service):
+    """Test high winds are reported in km/h"""
+    forecast_data = {
+        "list": [{"main": {"temp": 20}, "wind": {"speed": 25}, "weather": []}]
+    }
+
+    conditions = weather_service.analyze_forecast(forecast_data)
+
+    assert conditions[0].value == pytest.approx(90)
+    assert conditions[0].unit == "km/h"
+
+
+@patch("requests.Session.get")
+def test_fetch_forecast_success(mock_get, weather_service, forecast_response):
     """Test successful weather forecast retrieval"""
-    # Mock successful API response
-    mock_response = Mock()
-    mock_response.json.return_value = {"list": []}
-    mock_response.raise_for_status.return_value = None
-    mock_get.return_value = mock_response
+    mock_get.return_value = forecast_response
 
     forecast = weather_service.fetch_forecast()
 
@@ -106,33 +240,158 @@ def test_fetch_forecast_success(mock_get, weather_service):
     mock_get.assert_called_once()
 
 
-@patch("requests.get")
-def test_fetch_forecast_failure(mock_get, weather_service):
+@patch("requests.Session.get")
+def test_fetch_forecast_uses_cache(mock_get, weather_service, forecast_response):
+    """Test repeated forecast retrieval is served from the cache"""
+    mock_get.return_value = forecast_response
+
+    first = weather_service.fetch_forecast()
+    second = weather_service.fetch_forecast()
+
+    assert second is first
+    mock_get.assert_called_once()
+
+
+@patch("requests.Session.get")
+def test_fetch_forecast_not_modified(mock_get, weather_service, forecast_response):
+    """Test an expired cache entry is revalidated with its ETag"""
+    forecast_response.headers = {"ETag": '"abc"'}
+    mock_get.return_value = forecast_response
+
+    first = weather_service.fetch_forecast()
+
+    # Expire the cache and answer the revalidation with 304 Not Modified
+    weather_service.cache_ttl = 0
+    forecast_response.status_code = 304
+    second = weather_service.fetch_forecast()
+
+    assert second is first
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+
+@patch("requests.Session.get")
+def test_get_weather_conditions_skips_unchanged_forecast(
+    mock_get, weather_service, forecast_response
+):
+    """Test an identical forecast body is not analyzed twice"""
+    mock_get.return_value = forecast_response
+
+    # Disable the TTL cache so both calls download the forecast
+    weather_service.cache_ttl = 0
+    with patch.object(
+        weather_service, "analyze_forecast", return_value=[]
+    ) as mock_analyze:
+        weather_service.get_weather_conditions()
+        weather_service.get_weather_conditions()
+
+    assert mock_get.call_count == 2
+    mock_analyze.assert_called_once()
+
+
+def test_weather_services_share_session(mock_api_key, forecast_response):
+    """Test services given one session fetch through it"""
+    session = Mock()
+    session.get.return_value = forecast_response
+    services = [
+        WeatherService(mock_api_key, location, session=session)
+        for location in ("CityA", "CityB")
+    ]
+
+    for service in services:
+        service.fetch_forecast()
+
+    assert session.get.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "change_settings",
+    [
+        lambda service: setattr(service, "min_severity", "extreme"),
+        lambda service: service.thresholds["temperature"].update(extreme_high=45),
+    ],
+)
+@patch("requests.Session.get")
+def test_get_weather_conditions_reanalyzes_after_settings_change(
+    mock_get, weather_service, forecast_response, change_settings
+):
+    """Test a changed minimum severity or threshold invalidates the analysis"""
+    mock_get.return_value = forecast_response
+
+    with patch.object(
+        weather_service, "analyze_forecast", return_value=[]
+    ) as mock_analyze:
+        weather_service.get_weather_conditions()
+        change_settings(weather_service)
+        weather_service.get_weather_conditions()
+
+    assert mock_analyze.call_count == 2
+
+
+@patch("weather_alert.weather_service.time.sleep")
+@patch("requests.Session.get")
+def test_fetch_forecast_failure(mock_get, mock_sleep, weather_service):
     """Test weather forecast retrieval failure"""
     # Simulate a request exception
-    mock_get.side_effect = requests.RequestException("Network error")
+    mock_get.side_effect = requests.ConnectionError("Network error")
 
     forecast = weather_service.fetch_forecast()
 
     assert forecast is None
+    assert mock_get.call_count == 3
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [4, 8]
+
+
+@pytest.mark.parametrize(
+    "status_code, expected_attempts",
+    [
+        (401, 1),  # Bad API key fails fast
+        (404, 1),  # Unknown city fails fast
+        (503, 3),  # Server errors are retried
+    ],
+)
+@patch("weather_alert.weather_service.time.sleep")
+@patch("requests.Session.get")
+def test_fetch_forecast_http_error_retries(
+    mock_get,
+    mock_sleep,
+    weather_service,
+    forecast_response,
+    status_code,
+    expected_attempts,
+):
+    """Test only server-side HTTP errors are retried"""
+    forecast_response.status_code = status_code
+    forecast_response.raise_for_status.side_effect = requests.HTTPError(
+        response=forecast_response
+    )
+    mock_get.return_value = forecast_response
+
+    forecast = weather_service.fetch_forecast()
+
+    assert forecast is None
+    assert mock_get.call_count == expected_attempts
 
 
 def test_alert_system_filter_conditions(alert_system):
     """Test filtering weather conditions based on severity threshold"""
     conditions = [
         WeatherCondition(
-            type="temperature", severity="info", description="Mild", value=25, unit="°C"
+            type="temperature",
+            severity=Severity.INFO,
+            description="Mild",
+            value=25,
+            unit="°C",
         ),
         WeatherCondition(
             type="temperature",
-            severity="warning",
+            severity=Severity.WARNING,
             description="Getting Hot",
             value=35,
             unit="°C",
         ),
         WeatherCondition(
             type="wind",
-            severity="severe",
+            severity=Severity.SEVERE,
             description="High Winds",
             value=80,
             unit="km/h",
@@ -144,58 +403,91 @@ def test_alert_system_filter_conditions(alert_system):
 
     assert len(filtered_conditions) == 2
     assert all(
-        condition.severity in ["warning", "severe"] for condition in filtered_conditions
+        condition.severity in [Severity.WARNING, Severity.SEVERE]
+        for condition in filtered_conditions
     )
 
 
-@patch("http.client.HTTPSConnection")
-def test_send_notification_success(mock_https_connection, alert_system):
+def test_alert_system_threshold_can_be_changed(alert_system):
+    """Test updating notification_threshold changes filtering"""
+    conditions = [
+        WeatherCondition(
+            type="temperature",
+            severity=Severity.WARNING,
+            description="Getting Hot",
+            value=35,
+            unit="°C",
+        )
+    ]
+
+    alert_system.notification_threshold = "severe"
+
+    assert alert_system.filter_conditions(conditions) == []
+
+
+def test_alert_system_filters_heavy_rain_at_warning(alert_system, weather_service):
+    """Test heavy rain ranks as info and is dropped at the default threshold"""
+    forecast_data = {
+        "list": [
+            {
+                "main": {"temp": 20},
+                "wind": {"speed": 5},
+                "rain": {"3h": 60},
+                "weather": [],
+            }
+        ]
+    }
+
+    conditions = weather_service.analyze_forecast(forecast_data)
+
+    assert [condition.severity for condition in conditions] == [Severity.INFO]
+    assert alert_system.filter_conditions(conditions) == []
+
+
+@patch("requests.Session.post")
+def test_send_notification_success(mock_post, alert_system):
     """Test successful notification sending"""
     # Prepare test conditions
     conditions = [
         WeatherCondition(
             type="temperature",
-            severity="warning",
+            severity=Severity.WARNING,
             description="High Temp",
             value=35,
             unit="°C",
         )
     ]
 
-    # Mock the HTTPSConnection
+    # Mock the Pushover API response
     mock_response = Mock()
-    mock_response.status = 200
-    mock_connection = Mock()
-    mock_connection.getresponse.return_value = mock_response
-    mock_https_connection.return_value = mock_connection
+    mock_response.status_code = 200
+    mock_post.return_value = mock_response
 
     # Send notification
     result = alert_system.send_notification(conditions)
 
     assert result is True
-    mock_connection.request.assert_called_once()
+    mock_post.assert_called_once()
 
 
-@patch("http.client.HTTPSConnection")
-def test_send_notification_failure(mock_https_connection, alert_system):
+@patch("requests.Session.post")
+def test_send_notification_failure(mock_post, alert_system):
     """Test notification sending failure"""
     # Prepare test conditions
     conditions = [
         WeatherCondition(
             type="temperature",
-            severity="warning",
+            severity=Severity.WARNING,
             description="High Temp",
             value=35,
             unit="°C",
         )
     ]
 
-    # Mock the HTTPSConnection with a failure response
+    # Mock the Pushover API with a failure response
     mock_response = Mock()
-    mock_response.status = 400
-    mock_connection = Mock()
-    mock_connection.getresponse.return_value = mock_response
-    mock_https_connection.return_value = mock_connection
+    mock_response.status_code = 400
+    mock_post.return_value = mock_response
 
     # Send notification
     result = alert_system.send_notification(conditions)
@@ -203,19 +495,78 @@ def test_send_notification_failure(mock_https_connection, alert_system):
     assert result is False
 
 
-def test_format_condition_message(alert_system):
+@patch("requests.Session.post")
+def test_send_notifications_batch(mock_post, alert_system):
+    """Test conditions for several locations are sent as one notification"""
+    per_location = {
+        "CityA": [
+            WeatherCondition(
+                type="temperature",
+                severity=Severity.EXTREME,
+                description="Extreme Heat",
+                value=41,
+                unit="°C",
+            )
+        ],
+        "CityB": [
+            WeatherCondition(
+                type="wind",
+                severity=Severity.SEVERE,
+                description="High Winds",
+                value=80,
+                unit="km/h",
+            )
+        ],
+        "CityC": [
+            WeatherCondition(
+                type="temperature",
+                severity=Severity.INFO,
+                description="Mild",
+                value=25,
+                unit="°C",
+            )
+        ],
+    }
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_post.return_value = mock_response
+
+    result = alert_system.send_notifications_batch(per_location)
+
+    assert result is True
+    mock_post.assert_called_once()
+    message = mock_post.call_args.kwargs["data"]["message"]
+    assert "📍 CityA" in message
+    assert "📍 CityB" in message
+    assert "CityC" not in message
+
+
+def test_format_condition_message(alert_system, weather_service):
     """Test formatting of weather condition messages"""
-    conditions = [
+    heavy_rain = weather_service.analyze_forecast(
+        {
+            "list": [
+                {
+                    "main": {"temp": 20},
+                    "wind": {"speed": 5},
+                    "rain": {"3h": 60},
+                    "weather": [],
+                }
+            ]
+        }
+    )
+    conditions = heavy_rain + [
         WeatherCondition(
             type="temperature",
-            severity="warning",
+            severity=Severity.WARNING,
             description="High Temp",
             value=35,
             unit="°C",
         ),
         WeatherCondition(
             type="wind",
-            severity="severe",
+            severity=Severity.SEVERE,
             description="Strong Winds",
             value=80,
             unit="km/h",
@@ -226,3 +577,58 @@ def test_format_condition_message(alert_system):
 
     assert "🌡️ Warning High Temp: 35°C" in message
     assert "💨 Severe Strong Winds: 80km/h" in message
+    assert "🌧️ Heavy Heavy Rain: 60mm" in message
+
+
+def test_parse_locations():
+    """Test LOCATION is split on semicolons, ignoring blanks"""
+    assert parse_locations("A,UK; B,DE;") == ["A,UK", "B,DE"]
+
+
+def test_check_weather_skips_overlapping_run():
+    """Test a check is skipped while the previous one still holds the lock"""
+    weather_service = Mock()
+    alert_system = Mock()
+    lock = threading.Lock()
+
+    lock.acquire()
+    check_weather({"CityA": weather_service}, alert_system, lock)
+    lock.release()
+
+    weather_service.get_weather_conditions.assert_not_called()
+    alert_system.send_notifications_batch.assert_not_called()
+
+
+def test_check_weather_releases_lock():
+    """Test a completed check notifies and frees the lock for the next run"""
+    weather_service = Mock()
+    weather_service.get_weather_conditions.return_value = []
+    alert_system = Mock()
+    lock = threading.Lock()
+
+    check_weather({"CityA": weather_service}, alert_system, lock)
+
+    alert_system.send_notifications_batch.assert_called_once_with({"CityA": []})
+    assert not lock.locked()
+
+
+@patch("weather_alert.main.time.sleep")
+@patch("weather_alert.main.schedule")
+def test_run_scheduler_sleeps_until_due(mock_schedule, mock_sleep):
+    """Test the loop sleeps until the next job and exits once none remain"""
+    mock_schedule.idle_seconds.side_effect = [3600, None]
+
+    run_scheduler()
+
+    mock_sleep.assert_called_once_with(3600)
+    mock_schedule.run_pending.assert_called_once()
+
+
+@patch("weather_alert.main.schedule")
+def test_run_scheduler_exits_without_jobs(mock_schedule):
+    """Test the loop exits immediately when no jobs are scheduled"""
+    mock_schedule.idle_seconds.return_value = None
+
+    run_scheduler()
+
+    mock_schedule.run_pending.assert_not_called()
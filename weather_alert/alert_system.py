@@ -1,9 +1,10 @@
-import http.client
 import logging
-import urllib.parse
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from weather_alert.weather_service import WeatherCondition
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather_alert.weather_service import Severity, WeatherCondition
 
 
 class AlertSystem:
@@ -11,6 +12,10 @@ class AlertSystem:
     System responsible for sending notifications about weather conditions
     """
 
+    # Message icon per condition type; other types fall back to the default
+    _EMOJI = {"temperature": "🌡️", "wind": "💨", "precipitation": "🌧️"}
+    _DEFAULT_EMOJI = "⚡"
+
     def __init__(
         self,
         pushover_user_key: str,
@@ -26,13 +31,41 @@ class AlertSystem:
         """
         self.logger = logging.getLogger(self.__class__.__name__)
 
-        # Severity hierarchy
-        self.severity_levels = {"info": 0, "warning": 1, "severe": 2, "extreme": 3}
-
         self.notification_threshold = notification_threshold
         self.pushover_user_key = pushover_user_key
         self.pushover_app_token = pushover_app_token
 
+        # Persistent session so repeated alerts reuse the TLS connection
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+    @property
+    def notification_threshold(self) -> str:
+        """
+        Minimum severity name that triggers a notification
+        """
+        return self._notification_threshold
+
+    @notification_threshold.setter
+    def notification_threshold(self, value: str):
+        self._notification_threshold = value
+        self._threshold = Severity.from_name(value)
+
+    def _format_condition(self, condition: WeatherCondition) -> str:
+        """
+        Format a single weather condition as one message line
+
+        :param condition: Weather condition
+        :return: Formatted message line
+        """
+        # Measured condition types also report their value and unit
+        emoji = self._EMOJI.get(condition.type)
+        label = condition.label or condition.severity.name.capitalize()
+        line = f"{emoji or self._DEFAULT_EMOJI} {label} {condition.description}"
+        if emoji:
+            line += f": {condition.value}{condition.unit}"
+        return line
+
     def _format_condition_message(self, conditions: List[WeatherCondition]) -> str:
         """
         Format weather conditions into a human-readable message
@@ -44,28 +77,7 @@ class AlertSystem:
             return "No significant weather conditions detected."
 
         message_parts = ["⚠️ Weather Alert:\n"]
-
-        for condition in conditions:
-            # Format the condition message based on its type
-            if condition.type == "temperature":
-                message_parts.append(
-                    f"🌡️ {condition.severity.capitalize()} {condition.description}: "
-                    f"{condition.value}{condition.unit}"
-                )
-            elif condition.type == "wind":
-                message_parts.append(
-                    f"💨 {condition.severity.capitalize()} {condition.description}: "
-                    f"{condition.value}{condition.unit}"
-                )
-            elif condition.type == "precipitation":
-                message_parts.append(
-                    f"🌧️ {condition.severity.capitalize()} {condition.description}: "
-                    f"{condition.value}{condition.unit}"
-                )
-            else:
-                message_parts.append(
-                    f"⚡ {condition.severity.capitalize()} {condition.description}"
-                )
+        message_parts.extend(map(self._format_condition, conditions))
 
         return "\n".join(message_parts)
 
@@ -81,8 +93,7 @@ class AlertSystem:
         return [
             condition
             for condition in conditions
-            if self.severity_levels.get(condition.severity, 0)
-            >= self.severity_levels.get(self.notification_threshold, 0)
+            if condition.severity >= self._threshold
         ]
 
     def send_notification(
@@ -106,32 +117,63 @@ class AlertSystem:
         # Prepare message
         message = self._format_condition_message(filtered_conditions)
 
-        # Send notification
+        return self._send(message, title)
+
+    def _send(self, message: str, title: Optional[str] = None) -> bool:
+        """
+        Post a message to the Pushover API
+
+        :param message: Notification body
+        :param title: Optional custom notification title
+        :return: Whether notification was sent successfully
+        """
         try:
-            conn = http.client.HTTPSConnection("api.pushover.net:443")
-            conn.request(
-                "POST",
-                "/1/messages.json",
-                urllib.parse.urlencode(
-                    {
-                        "token": self.pushover_app_token,
-                        "user": self.pushover_user_key,
-                        "message": message,
-                        "title": title or "Weather Alert System",
-                    }
-                ),
-                {"Content-type": "application/x-www-form-urlencoded"},
+            response = self._session.post(
+                "https://api.pushover.net/1/messages.json",
+                data={
+                    "token": self.pushover_app_token,
+                    "user": self.pushover_user_key,
+                    "message": message,
+                    "title": title or "Weather Alert System",
+                },
+                timeout=10,
             )
-            response = conn.getresponse()
 
-            if response.status == 200:
+            if response.status_code == 200:
                 self.logger.info("Notification sent successfully")
                 return True
             else:
                 self.logger.error(
-                    f"Failed to send notification. Status: {response.status}"
+                    "Failed to send notification. Status: %s", response.status_code
                 )
                 return False
         except Exception as e:
-            self.logger.error(f"Failed to send notification: {e}")
+            self.logger.error("Failed to send notification: %s", e)
+            return False
+
+    def send_notifications_batch(
+        self,
+        per_location: Dict[str, List[WeatherCondition]],
+        title: Optional[str] = None,
+    ) -> bool:
+        """
+        Send a single push notification covering several locations
+
+        :param per_location: Weather conditions keyed by location
+        :param title: Optional custom notification title
+        :return: Whether notification was sent successfully
+        """
+        message_parts = ["⚠️ Weather Alert:"]
+
+        for location, conditions in per_location.items():
+            filtered_conditions = self.filter_conditions(conditions)
+            if filtered_conditions:
+                message_parts.append(f"\n📍 {location}")
+                message_parts.extend(map(self._format_condition, filtered_conditions))
+
+        # If no location has conditions meeting the threshold, do not send
+        if len(message_parts) == 1:
+            self.logger.info("No conditions meet notification threshold")
             return False
+
+        return self._send("\n".join(message_parts), title)
@@ -1,13 +1,19 @@
 import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
+import requests
 import schedule
 from dotenv import load_dotenv
 
 from weather_alert.alert_system import AlertSystem
 from weather_alert.weather_service import WeatherService
 
+logger = logging.getLogger("WeatherAlertApp")
+
 
 def setup_logging():
     """
@@ -20,6 +26,62 @@ def setup_logging():
     )
 
 
+def parse_locations(value: str) -> List[str]:
+    """
+    Split a LOCATION setting into individual locations
+
+    :param value: Locations separated by ";", e.g. "London,UK; Berlin,DE"
+    :return: List of non-empty, stripped locations
+    """
+    return [location.strip() for location in value.split(";") if location.strip()]
+
+
+def check_weather(
+    weather_services: Dict[str, WeatherService],
+    alert_system: AlertSystem,
+    lock: threading.Lock,
+):
+    """
+    Periodic weather checking function
+
+    :param weather_services: Weather services keyed by location
+    :param alert_system: Alert system used to send the notification
+    :param lock: Lock preventing overlapping checks
+    """
+    if not lock.acquire(blocking=False):
+        logger.warning("Previous weather check still running, skipping")
+        return
+
+    try:
+        # Fetch and analyze weather conditions for every location
+        conditions = {
+            location: weather_service.get_weather_conditions()
+            for location, weather_service in weather_services.items()
+        }
+
+        # Send one combined notification if conditions are met
+        alert_system.send_notifications_batch(conditions)
+
+    except Exception as e:
+        logger.error("Error in weather check: %s", e)
+    finally:
+        lock.release()
+
+
+def run_scheduler():
+    """
+    Run scheduled jobs until none are left, sleeping until each one is due
+    """
+    # Sleep until the next job is due instead of polling every second
+    while True:
+        idle_seconds = schedule.idle_seconds()
+        if idle_seconds is None:
+            break
+        if idle_seconds > 0:
+            time.sleep(idle_seconds)
+        schedule.run_pending()
+
+
 def main():
     """
     Main application entry point
@@ -29,50 +91,52 @@ def main():
 
     # Setup logging
     setup_logging()
-    logger = logging.getLogger("WeatherAlertApp")
 
     try:
         # Initialize services from environment variables
-        weather_service = WeatherService(
-            api_key=os.getenv("OPENWEATHERMAP_API_KEY", ""),
-            location=os.getenv("LOCATION", "London,UK"),
-        )
+        locations = parse_locations(os.getenv("LOCATION", "London,UK"))
+        notification_threshold = os.getenv("NOTIFICATION_THRESHOLD", "warning")
+        # One session for all locations so they share a connection pool
+        weather_session = requests.Session()
+        weather_services = {
+            location: WeatherService(
+                api_key=os.getenv("OPENWEATHERMAP_API_KEY", ""),
+                location=location,
+                min_severity=notification_threshold,
+                session=weather_session,
+            )
+            for location in locations
+        }
 
         alert_system = AlertSystem(
             pushover_user_key=os.getenv("PUSHOVER_USER_KEY", ""),
             pushover_app_token=os.getenv("PUSHOVER_APP_TOKEN", ""),
-            notification_threshold=os.getenv("NOTIFICATION_THRESHOLD", "warning"),
+            notification_threshold=notification_threshold,
         )
 
-        def check_weather():
-            """
-            Periodic weather checking function
-            """
-            try:
-                # Fetch and analyze weather conditions
-                conditions = weather_service.get_weather_conditions()
-
-                # Send notifications if conditions are met
-                alert_system.send_notification(conditions)
-
-            except Exception as e:
-                logger.error(f"Error in weather check: {e}")
+        # Prevents a slow check from overlapping with the next scheduled one
+        check_lock = threading.Lock()
 
-        # Schedule weather checks
-        schedule.every(1).hour.do(check_weather)
+        # Run checks off the scheduler thread so network I/O never stalls it
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Schedule weather checks
+            schedule.every(1).hour.do(
+                executor.submit,
+                check_weather,
+                weather_services,
+                alert_system,
+                check_lock,
+            )
 
-        logger.info("Weather Alert System started")
+            logger.info("Weather Alert System started")
 
-        # Run initial check
-        check_weather()
+            # Run initial check
+            executor.submit(check_weather, weather_services, alert_system, check_lock)
 
-        # Keep the application running
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+            run_scheduler()
 
     except Exception as e:
-        logger.error(f"Fatal error in weather alert system: {e}")
+        logger.error("Fatal error in weather alert system: %s", e)
 
 
 if __name__ == "__main__":
@@ -1,22 +1,89 @@
+import copy
+import hashlib
 import logging
+import re
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from enum import IntEnum
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 
-@dataclass
+class Severity(IntEnum):
+    """
+    Severity of a weather condition, ordered from least to most severe
+    """
+
+    INFO = 0
+    WARNING = 1
+    SEVERE = 2
+    EXTREME = 3
+
+    @classmethod
+    def from_name(cls, name: str) -> "Severity":
+        """
+        Look up a severity by its case-insensitive name
+
+        :param name: Severity name, e.g. "warning"
+        :return: Matching severity, or INFO for unknown names
+        """
+        return cls.__members__.get(name.upper(), cls.INFO)
+
+
+@dataclass(slots=True, frozen=True)
 class WeatherCondition:
     """
     Represents a specific weather condition
     """
 
     type: str
-    severity: str
+    severity: Severity
     description: str
     value: float
     unit: str
+    # Display label overriding the severity name, e.g. "Heavy" for rain
+    label: Optional[str] = None
+
+
+# Condition factories with the constant fields bound; only the value varies
+_EXTREME_HEAT = partial(
+    WeatherCondition, "temperature", Severity.EXTREME, "Extreme Heat", unit="°C"
+)
+_EXTREME_COLD = partial(
+    WeatherCondition, "temperature", Severity.EXTREME, "Extreme Cold", unit="°C"
+)
+_HIGH_WINDS = partial(
+    WeatherCondition, "wind", Severity.SEVERE, "High Winds", unit="km/h"
+)
+_HEAVY_RAIN = partial(
+    WeatherCondition,
+    "precipitation",
+    Severity.INFO,
+    "Heavy Rain",
+    unit="mm",
+    label="Heavy",
+)
+_SEVERE_WEATHER = partial(
+    WeatherCondition, "weather", Severity.SEVERE, value=0, unit=""
+)
+
+
+def _is_transient_error(error: requests.RequestException) -> bool:
+    """
+    Check whether a failed request is worth retrying
+
+    :param error: Exception raised by the request
+    :return: True for connection errors, timeouts and 5xx responses
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return (
+        isinstance(error, requests.HTTPError)
+        and error.response is not None
+        and error.response.status_code >= 500
+    )
 
 
 class WeatherService:
@@ -24,17 +91,45 @@ class WeatherService:
     Service responsible for fetching and analyzing weather data
     """
 
-    def __init__(self, api_key: str, location: str):
+    def __init__(
+        self,
+        api_key: str,
+        location: str,
+        cache_ttl: float = 1800,
+        min_severity: str = "info",
+        session: Optional[requests.Session] = None,
+    ):
         """
         Initialize WeatherService
 
         :param api_key: OpenWeatherMap API key
         :param location: City or location for weather monitoring
+        :param cache_ttl: Seconds a fetched forecast is reused without a request;
+            the default is shorter than the hourly check in main, so scheduled
+            checks always revalidate via ETag and only ad-hoc repeat calls hit it
+        :param min_severity: Minimum severity of conditions to report
+        :param session: Optional HTTP session to share between services
         """
         self.api_key = api_key
         self.location = location
+        self.cache_ttl = cache_ttl
+        self.min_severity = min_severity
         self.logger = logging.getLogger(self.__class__.__name__)
 
+        # Persistent session so hourly fetches reuse the pooled connection
+        self._session = session or requests.Session()
+
+        # Last fetched forecast as (fetch time, location, data) plus its ETag
+        self._cache: Optional[Tuple[float, str, Dict]] = None
+        self._etag: Optional[str] = None
+
+        # Digest of the last downloaded body, and the last analysis keyed on
+        # that digest plus the settings it was computed with
+        self._digest: Optional[bytes] = None
+        self._analyzed: Optional[
+            Tuple[Tuple[bytes, str, Dict], List[WeatherCondition]]
+        ] = None
+
         # Weather condition thresholds
         self.thresholds = {
             "temperature": {
@@ -67,30 +162,72 @@ class WeatherService:
             ],
         }
 
-    @retry(
-        stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
+        # Case-insensitive pattern for the severe condition keywords, rebuilt
+        # whenever thresholds["severe_conditions"] changes
+        self._severe_keywords: Optional[Tuple[str, ...]] = None
+        self._severe_re: Optional[re.Pattern] = None
+
     def fetch_forecast(self) -> Optional[Dict]:
         """
         Fetch weather forecast from OpenWeatherMap API
 
         :return: Weather forecast data or None
         """
-        base_url = "http://api.openweathermap.org/data/2.5/forecast"
+        base_url = "https://api.openweathermap.org/data/2.5/forecast"
         params = {
             "q": self.location,
             "appid": self.api_key,
             "units": "metric",  # Use metric units
         }
 
-        try:
-            self.logger.info(f"Fetching weather forecast for {self.location}")
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            self.logger.error(f"Error fetching weather data: {e}")
-            return None
+        # Reuse a recent response; older ones are revalidated with their ETag
+        cached = (
+            self._cache if self._cache and self._cache[1] == self.location else None
+        )
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[2]
+
+        headers = {"If-None-Match": self._etag} if cached and self._etag else {}
+
+        # Retry failed requests with exponential backoff (4s, then 8s)
+        for attempt in range(3):
+            try:
+                self.logger.info("Fetching weather forecast for %s", self.location)
+                response = self._session.get(
+                    base_url, params=params, headers=headers, timeout=10
+                )
+                if cached and response.status_code == 304:
+                    self._cache = (time.monotonic(), self.location, cached[2])
+                    return cached[2]
+
+                response.raise_for_status()
+                forecast = response.json()
+                self._digest = hashlib.blake2b(response.content, digest_size=8).digest()
+                self._etag = response.headers.get("ETag")
+                self._cache = (time.monotonic(), self.location, forecast)
+                return forecast
+            except requests.RequestException as e:
+                self.logger.error("Error fetching weather data: %s", e)
+                # Client errors such as a bad API key or unknown city never recover
+                if attempt == 2 or not _is_transient_error(e):
+                    break
+                time.sleep(min(10, 4 * 2**attempt))
+
+        return None
+
+    def _severe_pattern(self) -> re.Pattern:
+        """
+        Get the compiled pattern matching any severe condition keyword
+
+        :return: Case-insensitive pattern for thresholds["severe_conditions"]
+        """
+        keywords = tuple(self.thresholds["severe_conditions"])
+        if keywords != self._severe_keywords:
+            # An empty alternation would match everything, so never match instead
+            pattern = "|".join(map(re.escape, keywords)) or "(?!)"
+            self._severe_re = re.compile(pattern, re.IGNORECASE)
+            self._severe_keywords = keywords
+        return self._severe_re
 
     def analyze_forecast(self, forecast: Dict) -> List[WeatherCondition]:
         """
@@ -103,76 +240,55 @@ class WeatherService:
             self.logger.warning("Invalid forecast data")
             return []
 
+        # Bind thresholds once instead of re-resolving them for every entry
+        temp_high = self.thresholds["temperature"]["extreme_high"]
+        temp_low = self.thresholds["temperature"]["extreme_low"]
+        # Wind threshold in m/s, so only detected winds are converted to km/h
+        wind_severe_ms = self.thresholds["wind"]["severe"] / 3.6
+        rain_heavy_3h = self.thresholds["precipitation"]["heavy_rain"]["3h"]
+        severe_re = self._severe_pattern()
+
         dangerous_conditions = []
 
         for entry in forecast["list"]:
             # Temperature analysis
             temp = entry["main"]["temp"]
-            if temp > self.thresholds["temperature"]["extreme_high"]:
-                dangerous_conditions.append(
-                    WeatherCondition(
-                        type="temperature",
-                        severity="extreme",
-                        description="Extreme Heat",
-                        value=temp,
-                        unit="°C",
-                    )
-                )
-            elif temp < self.thresholds["temperature"]["extreme_low"]:
-                dangerous_conditions.append(
-                    WeatherCondition(
-                        type="temperature",
-                        severity="extreme",
-                        description="Extreme Cold",
-                        value=temp,
-                        unit="°C",
-                    )
-                )
+            if temp > temp_high:
+                dangerous_conditions.append(_EXTREME_HEAT(value=temp))
+            elif temp < temp_low:
+                dangerous_conditions.append(_EXTREME_COLD(value=temp))
 
             # Wind speed analysis
-            wind_speed = entry["wind"]["speed"] * 3.6  # Convert m/s to km/h
-            if wind_speed > self.thresholds["wind"]["severe"]:
-                dangerous_conditions.append(
-                    WeatherCondition(
-                        type="wind",
-                        severity="severe",
-                        description="High Winds",
-                        value=wind_speed,
-                        unit="km/h",
-                    )
-                )
+            wind_speed = entry["wind"]["speed"]
+            if wind_speed > wind_severe_ms:
+                # Convert m/s to km/h
+                dangerous_conditions.append(_HIGH_WINDS(value=wind_speed * 3.6))
 
             # Precipitation checks
-            if "rain" in entry and "3h" in entry["rain"]:
-                rain_volume = entry["rain"]["3h"]
-                if rain_volume > self.thresholds["precipitation"]["heavy_rain"]["3h"]:
-                    dangerous_conditions.append(
-                        WeatherCondition(
-                            type="precipitation",
-                            severity="heavy",
-                            description="Heavy Rain",
-                            value=rain_volume,
-                            unit="mm",
-                        )
-                    )
+            rain_volume = entry.get("rain", {}).get("3h")
+            if rain_volume is not None and rain_volume > rain_heavy_3h:
+                dangerous_conditions.append(_HEAVY_RAIN(value=rain_volume))
 
             # Severe weather conditions
-            for weather in entry.get("weather", []):
-                if any(
-                    condition in weather["main"].lower()
-                    for condition in self.thresholds["severe_conditions"]
-                ):
+            for weather in entry.get("weather", ()):
+                if severe_re.search(weather["main"]):
                     dangerous_conditions.append(
-                        WeatherCondition(
-                            type="weather",
-                            severity="severe",
-                            description=f"Severe Weather: {weather['description']}",
-                            value=0,
-                            unit="",
-                        )
+                        _SEVERE_WEATHER(f"Severe Weather: {weather['description']}")
                     )
 
-        return dangerous_conditions
+        # Report each condition at or above the minimum severity once,
+        # keeping its most extreme value
+        min_level = Severity.from_name(self.min_severity)
+        merged: Dict[Tuple[str, Severity, str], WeatherCondition] = {}
+        for condition in dangerous_conditions:
+            if condition.severity < min_level:
+                continue
+            key = (condition.type, condition.severity, condition.description)
+            current = merged.get(key)
+            if current is None or abs(condition.value) > abs(current.value):
+                merged[key] = condition
+
+        return list(merged.values())
 
     def get_weather_conditions(self) -> List[WeatherCondition]:
         """
@@ -181,6 +297,21 @@ class WeatherService:
         :return: List of detected weather conditions
         """
         forecast = self.fetch_forecast()
-        if forecast:
-            return self.analyze_forecast(forecast)
-        return []
+        if not forecast:
+            return []
+
+        # Skip re-analysis when the API returned an identical forecast body
+        # and neither the minimum severity nor the thresholds have changed
+        if (
+            self._analyzed
+            and self._analyzed[0][0] == self._digest
+            and self._analyzed[0][1] == self.min_severity
+            and self._analyzed[0][2] == self.thresholds
+        ):
+            return list(self._analyzed[1])
+
+        conditions = self.analyze_forecast(forecast)
+        if self._digest is not None:
+            key = (self._digest, self.min_severity, copy.deepcopy(self.thresholds))
+            self._analyzed = (key, conditions)
+        return list(conditions)